@@ -1,8 +1,17 @@
 # graphrag_platform/agents/router.py
-from typing import Dict, List
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import os
+import tempfile
+import numpy as np
 from .base import BaseAgent, AgentState
+from graphrag.cache import SimilarityIndex, unit_vector
+from neo4j_graphrag.embeddings.base import Embedder
 from neo4j_graphrag.llm import OpenAILLM
 
+logger = logging.getLogger(__name__)
+
 ROUTER_PROMPT = """Given a user query, determine the best retrieval strategy:
 
 1. Vector Search: For semantic similarity and concept understanding
@@ -14,27 +23,155 @@ Query: {query}
 
 Previous steps: {previous_steps}
 
-Determine the best strategy and explain why.
+Answer with the strategy name alone on the first line (Vector Search,
+Graph Traversal, Hybrid Search or Text2Cypher), then explain why.
 """
 
+# Strategy names in the prompt mapped to GraphRAGManager retriever types
+STRATEGIES = {
+    "vector search": "vector",
+    "graph traversal": "vector_cypher",
+    "hybrid search": "hybrid",
+    "text2cypher": "text2cypher",
+}
+
 class RouterAgent(BaseAgent):
     """Agent for determining optimal retrieval strategy"""
-    
-    def __init__(self, llm: OpenAILLM):
+
+    def __init__(self,
+                 llm: OpenAILLM,
+                 embedder: Optional[Embedder] = None,
+                 cache_path: Optional[str] = None,
+                 similarity_threshold: float = 0.92,
+                 max_cache_size: int = 1024,
+                 save_every: int = 32):
         super().__init__(llm)
-        self.prompt = PromptTemplate(
-            template=ROUTER_PROMPT,
-            input_variables=["query", "previous_steps"]
-        )
-    
+        # Plain str.format; PromptTemplate validation per call is not needed
+        self._render = ROUTER_PROMPT.format
+
+        # Semantic cache of (query embedding, strategy) decisions,
+        # used only when an embedder is given
+        self.embedder = embedder
+        self.cache_path = cache_path
+        self.similarity_threshold = similarity_threshold
+        self.max_cache_size = max_cache_size
+        # Persist after this many new decisions and on close
+        self.save_every = save_every
+        self._unsaved = 0
+        # Serializes saves so an older snapshot never replaces a newer one.
+        # Created lazily so it binds to the running event loop
+        self._save_lock: Optional[asyncio.Lock] = None
+        self._cache_key = f"{getattr(llm, 'model_name', '')}|{getattr(embedder, 'model', '')}"
+        self._router_cache = SimilarityIndex(max_cache_size)
+        if embedder and cache_path and os.path.exists(cache_path):
+            self._load_cache()
+
     async def process(self, state: AgentState) -> AgentState:
         """Determine best retrieval strategy"""
-        response = await self.llm.predict(
-            self.prompt.format(
-                query=state.query,
-                previous_steps=state.intermediate_steps
+        # Cached decisions only apply to the first routing step, later
+        # steps depend on the intermediate results as well
+        use_cache = self.embedder is not None and not state.intermediate_steps
+        strategy = None
+
+        if use_cache:
+            q_vec = await self._embed(state.query)
+            strategy = self._lookup(q_vec)
+
+        if strategy is None:
+            response = await self.llm.predict(
+                self._render(
+                    query=state.query,
+                    previous_steps=state.intermediate_steps
+                )
             )
-        )
-        
-        # Parse response to determine strategy
-        strategy = self._parse_strategy(response)
+
+            # Parse response to determine strategy
+            strategy = self._parse_strategy(response)
+            if use_cache:
+                self._store(q_vec, strategy)
+                self._unsaved += 1
+                if self._unsaved >= self.save_every:
+                    await self.save_cache()
+
+        state.intermediate_steps.append({
+            "agent": "router",
+            "strategy": strategy
+        })
+        return state
+
+    async def save_cache(self):
+        """Persist new cached decisions to cache_path"""
+        if not self.cache_path:
+            return
+        if self._save_lock is None:
+            self._save_lock = asyncio.Lock()
+
+        async with self._save_lock:
+            if not self._unsaved:
+                return
+            self._unsaved = 0
+
+            # Snapshot on the event loop, write in a worker thread
+            vectors, strategies = self._router_cache.entries()
+            try:
+                await asyncio.to_thread(self._save_cache, vectors.copy(), strategies)
+            except Exception as e:
+                logger.warning(f"Failed to save router cache: {str(e)}")
+
+    async def close(self):
+        """Save pending cached decisions"""
+        await self.save_cache()
+
+    @staticmethod
+    def _parse_strategy(response: str) -> str:
+        """Map the strategy named on the first line of the LLM response to a retriever type"""
+        lines = response.strip().splitlines()
+        text = lines[0].lower() if lines else ""
+        positions = {
+            strategy: text.find(name)
+            for name, strategy in STRATEGIES.items()
+            if name in text
+        }
+        if not positions:
+            return "vector"
+        return min(positions, key=positions.get)
+
+    async def _embed(self, query: str) -> np.ndarray:
+        return unit_vector(await asyncio.to_thread(self.embedder.embed_query, query))
+
+    def _lookup(self, q_vec: np.ndarray) -> Optional[str]:
+        """Return the cached strategy of the most similar prior query"""
+        return self._router_cache.best(q_vec, self.similarity_threshold)
+
+    def _store(self, q_vec: np.ndarray, strategy: str):
+        # The index keeps the most recent decisions
+        self._router_cache.add(q_vec, strategy)
+
+    def _load_cache(self):
+        """Load persisted decisions made with the same LLM and embedder"""
+        try:
+            with np.load(self.cache_path) as data:
+                if str(data['key']) != self._cache_key:
+                    logger.info(f"Ignoring router cache built for {data['key']}")
+                    return
+                for vec, strategy in zip(data['vectors'], data['strategies'].tolist()):
+                    self._router_cache.add(vec, strategy)
+        except Exception as e:
+            logger.warning(f"Failed to load router cache: {str(e)}")
+
+    def _save_cache(self, vectors: np.ndarray, strategies: List[str]):
+        """Write the cache to a temporary file and move it into place"""
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    key=np.array(self._cache_key),
+                    vectors=vectors,
+                    strategies=np.array(strategies)
+                )
+            os.replace(tmp_path, self.cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
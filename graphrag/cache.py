@@ -0,0 +1,292 @@
+# graphrag/cache.py
+from collections import OrderedDict
+from hashlib import sha1
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+import redis.asyncio as redis
+from neo4j_graphrag.embeddings.base import Embedder
+
+logger = logging.getLogger(__name__)
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for cache keys"""
+    return " ".join(text.strip().lower().split())
+
+def unit_vector(values) -> np.ndarray:
+    """Return values as a unit-normalized float32 vector"""
+    vec = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+class SimilarityIndex:
+    """
+    Fixed-capacity ring buffer of unit vectors and their values.
+
+    Vectors are written into a matrix preallocated on the first insert;
+    once full, the oldest entry is overwritten. A lookup is a single
+    matrix-vector product over the filled rows.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, vec: np.ndarray, value: Any):
+        """Insert a vector, overwriting the oldest entry when full"""
+        if self._matrix is None:
+            self._matrix = np.empty((self.capacity, vec.shape[0]), dtype=np.float32)
+        self._matrix[self._next] = vec
+        if len(self._values) < self.capacity:
+            self._values.append(value)
+        else:
+            self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+
+    def best(self, vec: np.ndarray, threshold: float) -> Optional[Any]:
+        """Return the value of the most similar vector if it meets the threshold"""
+        n = len(self._values)
+        if not n:
+            return None
+
+        scores = self._matrix[:n] @ vec
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return self._values[best]
+
+    def entries(self) -> Tuple[Optional[np.ndarray], List[Any]]:
+        """Return the vectors and values, oldest first"""
+        n = len(self._values)
+        if n < self.capacity:
+            matrix = self._matrix[:n] if self._matrix is not None else None
+            return matrix, list(self._values)
+        order = np.roll(np.arange(n), -self._next)
+        return self._matrix[order], [self._values[i] for i in order]
+
+    def clear(self):
+        self._values = []
+        self._next = 0
+
+class AsyncEmbeddingCache(Embedder):
+    """
+    Caching wrapper around an embedder.
+
+    Query embeddings are kept in an exact-match LRU keyed on the normalized
+    query text. Search results are stored per scope (retriever type, top_k)
+    in a SimilarityIndex of their query embeddings, so a repeated or
+    near-duplicate query can be answered with a single dot product instead
+    of an embedding request and a retrieval round-trip.
+    """
+
+    def __init__(self,
+                 embedder: Embedder,
+                 max_size: int = 1024,
+                 similarity_threshold: float = 0.97):
+        super().__init__()
+        self.embedder = embedder
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.generation = 0
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._results: Dict[Hashable, SimilarityIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return sha1(normalize_query(text).encode("utf-8")).hexdigest()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Return the unit-normalized query embedding, using the LRU"""
+        key = self._key(text)
+        with self._lock:
+            vec = self._vectors.get(key)
+            if vec is not None:
+                self._vectors.move_to_end(key)
+                return vec
+
+        vec = unit_vector(self.embedder.embed_query(text))
+
+        with self._lock:
+            self._vectors[key] = vec
+            if len(self._vectors) > self.max_size:
+                self._vectors.popitem(last=False)
+        return vec
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed query text, reusing cached embeddings"""
+        return self._embed(text).tolist()
+
+    def lookup(self, query: str, scope: Hashable) -> Tuple[Optional[Dict], np.ndarray]:
+        """
+        Return a cached result for the query or a near-duplicate of it
+
+        The query embedding is returned as well, to be passed to store()
+        without embedding the query again.
+        """
+        vec = self._embed(query)
+        with self._lock:
+            index = self._results.get(scope)
+            result = index.best(vec, self.similarity_threshold) if index else None
+
+        if result is not None:
+            logger.debug("Cache hit for near-duplicate query")
+        return result, vec
+
+    def store(self,
+              vec: np.ndarray,
+              scope: Hashable,
+              result: Dict,
+              generation: Optional[int] = None):
+        """
+        Cache a search result under the query embedding
+
+        Args:
+            vec: Query embedding returned by lookup()
+            scope: Key separating results of different search settings
+            result: Search result to cache
+            generation: Cache generation the result was computed in;
+                        stale results are discarded
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            index = self._results.get(scope)
+            if index is None:
+                index = self._results[scope] = SimilarityIndex(self.max_size)
+            index.add(vec, result)
+
+    def invalidate(self):
+        """Drop cached results, e.g. after the index content changed"""
+        with self._lock:
+            self.generation += 1
+            self._results.clear()
+
+class SearchResultCache:
+    """
+    Two-tier cache of search results.
+
+    An in-process LRU is checked first, then Redis if a URL is configured.
+    Keys include an index version that is bumped on invalidation, so stale
+    entries are never read again and expire with their TTL. With Redis the
+    version is kept there, so an invalidation by one process (e.g. after
+    ingestion) is seen by every process sharing the cache within
+    version_ttl seconds; in between, L1 hits need no round-trip.
+    """
+
+    VERSION_KEY = "graphrag:search:version"
+
+    def __init__(self,
+                 max_size: int = 1024,
+                 redis_url: Optional[str] = None,
+                 ttl: int = 3600,
+                 version_ttl: float = 1.0,
+                 socket_timeout: float = 0.5):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self.index_version = 0
+        self._l1: "OrderedDict[str, Dict]" = OrderedDict()
+        # Version last read from Redis and when, see _get_version
+        self._version: Optional[str] = None
+        self._version_read_at = 0.0
+        self._redis = redis.Redis.from_url(
+            redis_url,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout
+        ) if redis_url else None
+
+    async def key(self, query: str, retriever_type: str, top_k: int) -> str:
+        """Cache key for a search at the current index version"""
+        version = await self._get_version()
+        raw = f"{version}|{retriever_type}|{top_k}|{normalize_query(query)}"
+        return "graphrag:search:" + sha1(raw.encode("utf-8")).hexdigest()
+
+    async def _get_version(self) -> str:
+        """Shared index version from Redis, the local one without Redis"""
+        # Kept apart from Redis versions so the two never share keys
+        local = f"local:{self.index_version}"
+        if self._redis is None:
+            return local
+
+        # Reuse the last read for version_ttl seconds
+        now = time.monotonic()
+        if self._version is not None and now - self._version_read_at < self.version_ttl:
+            return self._version
+
+        try:
+            version = await self._redis.get(self.VERSION_KEY)
+            self._version = version.decode() if version is not None else "0"
+        except redis.RedisError as e:
+            # Also cached, so an unreachable Redis costs one timeout per TTL
+            logger.warning(f"Redis cache version lookup failed: {str(e)}")
+            self._version = local
+        self._version_read_at = now
+        return self._version
+
+    async def get(self, key: str) -> Optional[Dict]:
+        result = self._l1.get(key)
+        if result is not None:
+            self._l1.move_to_end(key)
+            return result
+
+        if self._redis is None:
+            return None
+        try:
+            data = await self._redis.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache lookup failed: {str(e)}")
+            return None
+        if data is None:
+            return None
+
+        result = json.loads(data)
+        self._set_l1(key, result)
+        return result
+
+    async def set(self, key: str, result: Dict):
+        self._set_l1(key, result)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.setex(key, self.ttl, json.dumps(result, default=str))
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache write failed: {str(e)}")
+
+    def _set_l1(self, key: str, result: Dict):
+        self._l1[key] = result
+        self._l1.move_to_end(key)
+        if len(self._l1) > self.max_size:
+            self._l1.popitem(last=False)
+
+    def invalidate_local(self):
+        """Bump the local index version and clear the in-process tier"""
+        self.index_version += 1
+        self._version = None
+        self._l1.clear()
+
+    async def invalidate(self):
+        """Bump the index version so all cached results are missed"""
+        self.invalidate_local()
+        if self._redis is None:
+            return
+        try:
+            self._version = str(await self._redis.incr(self.VERSION_KEY))
+            self._version_read_at = time.monotonic()
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache invalidation failed: {str(e)}")
+
+    async def aclose(self):
+        """Close the Redis connection pool"""
+        if self._redis is not None:
+            await self._redis.aclose()
@@ -15,3 +15,14 @@ class GraphRAGConfig:
     llm_model: str = "gpt-4-turbo-preview"
     temperature: float = 0
     top_k: int = 5
+    neighbor_limit: int = 25
+    cache_size: int = 1024
+    cache_similarity_threshold: float = 0.97
+    redis_url: Optional[str] = None
+    cache_ttl: int = 3600
+    cache_version_ttl: float = 1.0
+    redis_socket_timeout: float = 0.5
+    max_concurrent: int = 4
+    max_connection_pool_size: int = 64
+    connection_acquisition_timeout: float = 30
+    max_connection_lifetime: int = 3600
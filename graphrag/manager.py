@@ -1,5 +1,6 @@
 # graphrag/manager.py
 from typing import Dict, List, Optional, Any
+import asyncio
 import logging
 from neo4j import GraphDatabase
 
@@ -16,10 +17,16 @@ from neo4j_graphrag.generation import GraphRAG
 from neo4j_graphrag.llm import OpenAILLM
 from neo4j_graphrag.types import RetrieverResultItem
 
+from .cache import AsyncEmbeddingCache, SearchResultCache
 from .config import GraphRAGConfig
 
 logger = logging.getLogger(__name__)
 
+# Retrievers that embed the query with self.embedder. Only these use the
+# near-duplicate cache; the others would pay for an extra embedding request,
+# and text2cypher answers can hinge on a literal that similarity ignores.
+SEMANTIC_CACHE_TYPES = {"vector", "vector_cypher", "hybrid", "hybrid_cypher"}
+
 class GraphRAGManager:
     """GraphRAG manager supporting multiple retrieval strategies"""
     
@@ -27,16 +34,30 @@ class GraphRAGManager:
         self.config = config
         self.driver = GraphDatabase.driver(
             config.neo4j_uri,
-            auth=(config.neo4j_username, config.neo4j_password)
+            auth=(config.neo4j_username, config.neo4j_password),
+            max_connection_pool_size=config.max_connection_pool_size,
+            connection_acquisition_timeout=config.connection_acquisition_timeout,
+            max_connection_lifetime=config.max_connection_lifetime
+        )
+        self.embedder = AsyncEmbeddingCache(
+            OpenAIEmbeddings(model=config.embedding_model),
+            max_size=config.cache_size,
+            similarity_threshold=config.cache_similarity_threshold
         )
-        self.embedder = OpenAIEmbeddings(
-            model=config.embedding_model
+        self.result_cache = SearchResultCache(
+            max_size=config.cache_size,
+            redis_url=config.redis_url,
+            ttl=config.cache_ttl,
+            version_ttl=config.cache_version_ttl,
+            socket_timeout=config.redis_socket_timeout
         )
         self.llm = OpenAILLM(
             api_key=config.openai_api_key,
             model_name=config.llm_model,
             model_params={"temperature": config.temperature}
         )
+        self._rag_by_type: Dict[str, GraphRAG] = {}
+        self._search_semaphore: Optional[asyncio.Semaphore] = None
         self._setup_retrievers()
 
     def _setup_retrievers(self):
@@ -49,16 +70,23 @@ class GraphRAGManager:
             return_properties=["title", "text", "metadata"]
         )
 
-        # Vector retriever with graph traversal
-        cypher_query = """
-        MATCH (n)-[r]-(related)
-        WHERE id(n) = node.id
-        WITH n, collect(DISTINCT type(r)) as relationships,
-             collect(DISTINCT related) as related_nodes
-        RETURN n.title as title, 
-               n.text as text,
-               relationships,
-               related_nodes
+        # Vector retriever with graph traversal. The retriever binds the
+        # matched node as `node`; neighbours are read with bounded COLLECT
+        # subqueries instead of expanding every edge of hub nodes.
+        cypher_query = f"""
+        RETURN node.title AS title,
+               node.text AS text,
+               COLLECT {{
+                   MATCH (node)-[r]-()
+                   RETURN DISTINCT type(r)
+                   LIMIT {self.config.neighbor_limit}
+               }} AS relationships,
+               COLLECT {{
+                   MATCH (node)--(related)
+                   WITH DISTINCT related
+                   LIMIT {self.config.neighbor_limit}
+                   RETURN related {{.title, .id}}
+               }} AS related_nodes
         """
         
         self.vector_cypher_retriever = VectorCypherRetriever(
@@ -86,14 +114,36 @@ class GraphRAGManager:
                 embedder=self.embedder
             )
 
+        # One GraphRAG pipeline per configured retriever, reused across searches
+        retrievers = {
+            "vector": self.vector_retriever,
+            "vector_cypher": self.vector_cypher_retriever,
+            "hybrid": getattr(self, 'hybrid_retriever', None),
+            "hybrid_cypher": getattr(self, 'hybrid_cypher_retriever', None)
+        }
+        for name, retriever in retrievers.items():
+            if retriever:
+                self._rag_by_type[name] = GraphRAG(retriever=retriever, llm=self.llm)
+
     def setup_text2cypher(self, schema: str, examples: List[str]):
-        """Initialize Text2Cypher retriever with schema and examples"""
+        """
+        Initialize Text2Cypher retriever with schema and examples
+
+        Results cached in this process are dropped; await invalidate_cache()
+        to drop results shared through Redis as well.
+        """
         self.text2cypher_retriever = Text2CypherRetriever(
             driver=self.driver,
             llm=self.llm,
             neo4j_schema=schema,
             examples=examples
         )
+        self._rag_by_type["text2cypher"] = GraphRAG(
+            retriever=self.text2cypher_retriever,
+            llm=self.llm
+        )
+        self.embedder.invalidate()
+        self.result_cache.invalidate_local()
 
     def setup_multimodal(self, image_model: str = "clip-ViT-B-32"):
         """Setup for multimodal retrieval with image support"""
@@ -116,6 +166,10 @@ class GraphRAGManager:
             embedder=self.image_embedder,
             result_formatter=format_image_result
         )
+        self._rag_by_type["multimodal"] = GraphRAG(
+            retriever=self.image_retriever,
+            llm=self.llm
+        )
 
     async def search(self, 
                     query: str,
@@ -130,35 +184,97 @@ class GraphRAGManager:
                           "hybrid_cypher", "text2cypher", "multimodal"
             **kwargs: Additional retriever-specific parameters
         """
-        retrievers = {
-            "vector": self.vector_retriever,
-            "vector_cypher": self.vector_cypher_retriever,
-            "hybrid": getattr(self, 'hybrid_retriever', None),
-            "hybrid_cypher": getattr(self, 'hybrid_cypher_retriever', None),
-            "text2cypher": getattr(self, 'text2cypher_retriever', None),
-            "multimodal": getattr(self, 'image_retriever', None)
-        }
-        
-        retriever = retrievers.get(retriever_type)
-        if not retriever:
+        rag = self._rag_by_type.get(retriever_type)
+        if not rag:
             raise ValueError(f"Invalid or unconfigured retriever type: {retriever_type}")
 
-        rag = GraphRAG(
-            retriever=retriever,
-            llm=self.llm
-        )
-        
-        response = await rag.search(
-            query_text=query,
-            retriever_config={"top_k": kwargs.get('top_k', self.config.top_k)}
-        )
+        top_k = kwargs.get('top_k', self.config.top_k)
+        scope = (retriever_type, top_k)
+        generation = self.embedder.generation
+        cache_key = await self.result_cache.key(query, retriever_type, top_k)
+
+        # Exact repeats are served from the in-process LRU or Redis
+        cached = await self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Near-duplicate queries skip retrieval via embedding similarity
+        use_semantic = retriever_type in SEMANTIC_CACHE_TYPES
+        if use_semantic:
+            cached, q_vec = await asyncio.to_thread(self.embedder.lookup, query, scope)
+            if cached is not None:
+                await self.result_cache.set(cache_key, cached)
+                return cached
+
+        # GraphRAG.search is blocking; run it off the event loop and bound
+        # the number of in-flight searches to respect OpenAI rate limits
+        async with self._get_semaphore():
+            response = await asyncio.to_thread(
+                rag.search,
+                query_text=query,
+                retriever_config={"top_k": top_k}
+            )
         
-        return {
+        result = {
             "answer": response.answer,
             "items": [item.dict() for item in response.items] if response.items else []
         }
+        if use_semantic:
+            self.embedder.store(q_vec, scope, result, generation=generation)
+        await self.result_cache.set(cache_key, result)
+        return result
+
+    async def search_multi(self,
+                           query: str,
+                           retriever_types: Optional[List[str]] = None,
+                           **kwargs) -> Dict[str, Dict]:
+        """
+        Run the same query against several retrievers concurrently
+
+        Args:
+            query: Search query text
+            retriever_types: Retriever types to compare, defaults to all
+                           configured retrievers
+            **kwargs: Additional retriever-specific parameters
+
+        Returns:
+            Mapping of retriever type to its search result. Failed searches
+            map to a result with an "error" entry.
+        """
+        if retriever_types is None:
+            retriever_types = list(self._rag_by_type)
+
+        results = await asyncio.gather(
+            *(self.search(query, retriever_type=name, **kwargs)
+              for name in retriever_types),
+            return_exceptions=True
+        )
+
+        combined = {}
+        for name, result in zip(retriever_types, results):
+            if isinstance(result, Exception):
+                logger.error(f"Search with {name} retriever failed: {str(result)}")
+                result = {"answer": None, "items": [], "error": str(result)}
+            combined[name] = result
+        return combined
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._search_semaphore is None:
+            self._search_semaphore = asyncio.Semaphore(self.config.max_concurrent)
+        return self._search_semaphore
+
+    async def invalidate_cache(self):
+        """Invalidate cached search results, e.g. after new content is ingested"""
+        self.embedder.invalidate()
+        await self.result_cache.invalidate()
 
     def close(self):
         """Close database connection"""
         if self.driver:
             self.driver.close()
+
+    async def aclose(self):
+        """Close the result cache and database connections"""
+        await self.result_cache.aclose()
+        self.close()
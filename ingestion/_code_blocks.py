@@ -0,0 +1,68 @@
+# graphrag_platform/ingestion/_code_blocks.py
+"""
+Code block and repository link detection.
+
+Kept free of heavy imports so process pool workers started with the
+spawn method only load this module.
+"""
+import re
+from typing import List
+
+import numpy as np
+
+# RE2 matches in linear time without backtracking; fall back to re
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Separator used to scan many segment texts in one pass; code blocks
+# never match across it
+_SEP_CHAR = "\u241F"
+_SEGMENT_SEP = f"\n{_SEP_CHAR}\n"
+
+# Fenced ``` blocks or runs of lines indented by four spaces or a tab.
+# Flags are inline and the separator is a literal character so the
+# pattern is valid for both engines.
+_CODE_RE = _regex.compile(
+    f"(?sm)```([^{_SEP_CHAR}]*?)```|((?:^(?: {{4}}|\t)[^\n{_SEP_CHAR}]*\n?)+)"
+)
+
+# Common code repository links. The class is spelled out because \w is
+# ASCII-only in RE2 but Unicode-aware in re.
+_REPO_RE = _regex.compile(
+    r"https?://(?:github\.com|gitlab\.com|bitbucket\.org)/[A-Za-z0-9_-]+/[A-Za-z0-9_-]+"
+)
+
+def _code_block(match) -> str:
+    if match.group(1) is not None:
+        return match.group(1).strip()
+    return "\n".join(line.strip() for line in match.group(2).splitlines())
+
+def find_code_blocks(text: str) -> List[str]:
+    """
+    Find fenced and indented code blocks in text
+
+    A fenced block needs its closing ```; an unterminated fence is prose.
+    A run of lines indented by four spaces or a tab is a block, including
+    one that ends the text.
+    """
+    return [_code_block(match) for match in _CODE_RE.finditer(text)]
+
+def find_code_blocks_batch(texts: List[str]) -> List[List[str]]:
+    """Find code blocks in each of many texts with a single regex pass"""
+    blocks = [[] for _ in texts]
+    matches = list(_CODE_RE.finditer(_SEGMENT_SEP.join(texts)))
+    if not matches:
+        return blocks
+    
+    # Map each match back to its text by offset in the joined string
+    starts = np.cumsum([0] + [len(text) + len(_SEGMENT_SEP) for text in texts[:-1]])
+    owners = np.searchsorted(starts, [match.start() for match in matches], side='right') - 1
+    for owner, match in zip(owners, matches):
+        blocks[owner].append(_code_block(match))
+    return blocks
+
+def extract_code_repos(description: str) -> List[str]:
+    """Extract code repository links from description"""
+    return _REPO_RE.findall(description)
@@ -0,0 +1,42 @@
+# graphrag_platform/ingestion/_numba_kernels.py
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+@njit(cache=True)
+def assign_speakers(ts, starts, ends):
+    """
+    Find the speaker turn covering each timestamp with a two-pointer sweep
+
+    Handles overlapping turns: among turns started at or before a timestamp,
+    the one extending furthest is chosen if it still covers the timestamp.
+
+    Args:
+        ts: Timestamps, sorted ascending
+        starts: Turn start times, sorted ascending
+        ends: Turn end times, in the same order as starts
+
+    Returns:
+        Index into starts/ends per timestamp, -1 where no turn covers it
+    """
+    out = np.full(ts.shape[0], -1, np.int64)
+    j = 0
+    best = -1
+    for i in range(ts.shape[0]):
+        t = ts[i]
+        while j < starts.shape[0] and starts[j] <= t:
+            if best < 0 or ends[j] > ends[best]:
+                best = j
+            j += 1
+        if best >= 0 and ends[best] >= t:
+            out[i] = best
+    return out
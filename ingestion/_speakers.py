@@ -0,0 +1,83 @@
+# graphrag_platform/ingestion/_speakers.py
+"""
+Speaker assignment for transcript segments.
+
+The NumPy implementation is the reference; the numba kernel is only used
+as a faster equivalent when numba is installed.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ._numba_kernels import HAVE_NUMBA, assign_speakers as _sweep_kernel
+
+def covering_turns(ts: np.ndarray,
+                   starts: np.ndarray,
+                   ends: np.ndarray) -> np.ndarray:
+    """
+    Find the speaker turn covering each timestamp
+
+    Among turns started at or before a timestamp, the one extending
+    furthest is chosen (the earliest on ties) if it still covers the
+    timestamp, so overlapping turns are handled.
+
+    Args:
+        ts: Timestamps, in any order
+        starts: Turn start times, sorted ascending
+        ends: Turn end times, in the same order as starts
+
+    Returns:
+        Index into starts/ends per timestamp, -1 where no turn covers it
+    """
+    if not len(starts):
+        return np.full(len(ts), -1, np.int64)
+
+    # Running max of the ends and the index of the turn reaching it first
+    max_end = np.maximum.accumulate(ends)
+    reaches_max = np.concatenate(([True], ends[1:] > max_end[:-1]))
+    max_idx = np.maximum.accumulate(
+        np.where(reaches_max, np.arange(len(ends)), 0)
+    )
+
+    # Latest turn starting at or before each timestamp
+    idx = np.searchsorted(starts, ts, side='right') - 1
+    safe_idx = np.maximum(idx, 0)
+    found = (idx >= 0) & (ts <= max_end[safe_idx])
+    return np.where(found, max_idx[safe_idx], -1).astype(np.int64)
+
+def assign_speakers(timestamps: np.ndarray,
+                    speakers: List[Dict]) -> List[Optional[str]]:
+    """
+    Find the speaker at each timestamp
+
+    Args:
+        timestamps: Segment start times
+        speakers: Diarization turns with 'start', 'end' and 'speaker'
+
+    Returns:
+        Speaker label per timestamp, None where no turn covers it
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if not speakers or not len(timestamps):
+        return [None] * len(timestamps)
+
+    # Sort speaker turns by start time
+    starts = np.fromiter((s['start'] for s in speakers), float)
+    order = np.argsort(starts, kind='stable')
+    starts = starts[order]
+    ends = np.fromiter((s['end'] for s in speakers), float)[order]
+    labels = np.array([s['speaker'] for s in speakers], dtype=object)[order]
+
+    if HAVE_NUMBA:
+        # The kernel sweeps timestamps in ascending order
+        ts_order = np.argsort(timestamps, kind='stable')
+        idx = np.empty(len(timestamps), np.int64)
+        idx[ts_order] = _sweep_kernel(
+            np.ascontiguousarray(timestamps[ts_order]),
+            starts,
+            ends
+        )
+    else:
+        idx = covering_turns(timestamps, starts, ends)
+
+    return np.where(idx >= 0, labels[np.maximum(idx, 0)], None).tolist()
@@ -1,22 +1,115 @@
 # graphrag_platform/ingestion/dataset_manager.py
-from typing import Dict, List, Optional
-from datasets import Dataset, load_dataset
+from typing import Dict, List, Optional, Union
+import asyncio
+import dataclasses
+from datasets import Dataset, Features, Value, concatenate_datasets, load_dataset
+import numpy as np
 import logging
-from .video_processor import VideoMetadata, TranscriptSegment
+from .video_processor import VideoMetadata, TranscriptSegment, SegmentColumns
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_DTYPES = ("fp16", "int8")
+
+# Transcript segment fields written by encode_embedding
+EMBEDDING_FEATURES = {
+    'embedding': Value('binary'),
+    'embedding_dtype': Value('string'),
+    'embedding_scale': Value('float64')
+}
+
+def encode_embedding(embedding: List[float], dtype: str = "fp16") -> Dict:
+    """Quantize an embedding to fp16 or per-vector scaled int8 bytes"""
+    vec = np.asarray(embedding, dtype=np.float32)
+    if dtype == "int8":
+        max_abs = float(np.abs(vec).max())
+        scale = max_abs / 127 if max_abs > 0 else 1.0
+        data = np.round(vec / scale).astype(np.int8).tobytes()
+    else:
+        scale = 1.0
+        data = vec.astype(np.float16).tobytes()
+    return {
+        'embedding': data,
+        'embedding_dtype': dtype,
+        'embedding_scale': scale
+    }
+
+def decode_embedding(segment: Dict) -> Optional[np.ndarray]:
+    """Decode a stored segment embedding to float32"""
+    data = segment.get('embedding')
+    if data is None:
+        return None
+    
+    dtype = segment.get('embedding_dtype')
+    if dtype == "int8":
+        return np.frombuffer(data, dtype=np.int8).astype(np.float32) * segment['embedding_scale']
+    if dtype == "fp16":
+        return np.frombuffer(data, dtype=np.float16).astype(np.float32)
+    # Rows written before quantization store plain float lists
+    return np.asarray(data, dtype=np.float32)
+
+def _segment_fields(features: Features) -> Dict:
+    """Features of a transcript segment, empty if not known yet"""
+    feature = features.get('transcript_segments')
+    item = feature[0] if isinstance(feature, list) else getattr(feature, 'feature', None)
+    return dict(item) if isinstance(item, dict) else {}
+
+def _is_null(feature) -> bool:
+    """Whether a feature was inferred from null values or empty lists only"""
+    if isinstance(feature, list):
+        feature = feature[0] if feature else None
+    if feature is None:
+        return False
+    return feature == Value('null') or _is_null(getattr(feature, 'feature', None))
+
+def _merge_feature(existing, new):
+    """
+    Merge two features, taking the new type wherever the existing one was
+    inferred from nulls only. Structs and lists are merged recursively.
+    """
+    if existing is None or _is_null(existing):
+        return new
+    if new is None:
+        return existing
+    if isinstance(existing, dict) and isinstance(new, dict):
+        merged = existing.copy()
+        for name, feature in new.items():
+            merged[name] = _merge_feature(existing.get(name), feature)
+        return merged
+    if isinstance(existing, list) and isinstance(new, list) and existing and new:
+        return [_merge_feature(existing[0], new[0])]
+    if type(existing) is type(new) and hasattr(existing, 'feature'):
+        return dataclasses.replace(existing, feature=_merge_feature(existing.feature, new.feature))
+    return existing
+
+def _with_segment_fields(features: Features, fields: Dict) -> Features:
+    """Copy of features with the transcript segment fields replaced"""
+    feature = features['transcript_segments']
+    features = features.copy()
+    features['transcript_segments'] = [fields] if isinstance(feature, list) else type(feature)(fields)
+    return features
+
 class DatasetManager:
     """Manages HuggingFace dataset operations"""
     
-    def __init__(self, dataset_name: str):
+    def __init__(self,
+                 dataset_name: str,
+                 flush_every: int = 32,
+                 embedding_dtype: str = "fp16"):
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {embedding_dtype}")
         self.dataset_name = dataset_name
+        self.embedding_dtype = embedding_dtype
         self.dataset = None
+        self._pending: List[Dict] = []
+        self._flush_every = flush_every
+        # video_id -> row index over dataset rows followed by pending rows
+        self._idx: Dict[str, int] = {}
     
     async def initialize(self):
         """Initialize or load dataset"""
         try:
-            self.dataset = load_dataset(self.dataset_name)
+            self.dataset = load_dataset(self.dataset_name, split="train")
             logger.info(f"Loaded existing dataset: {self.dataset_name}")
         except Exception as e:
             logger.info(f"Creating new dataset: {self.dataset_name}")
@@ -28,12 +121,23 @@ class DatasetManager:
                 'metadata': [],
                 'version': []
             })
+        self._build_index()
+    
+    def _build_index(self):
+        """Index video ids to row positions using columnar access"""
+        video_ids = list(self.dataset['video_id']) if len(self.dataset) else []
+        video_ids.extend(row['video_id'] for row in self._pending)
+        self._idx = {video_id: i for i, video_id in enumerate(video_ids)}
     
     async def add_video(self,
                        metadata: VideoMetadata,
-                       segments: List[TranscriptSegment],
+                       segments: Union[List[TranscriptSegment], SegmentColumns],
                        version: str = "1.0.0"):
         """Add video data to dataset"""
+        if self.dataset is None:
+            await self.initialize()
+        if isinstance(segments, SegmentColumns):
+            segments = segments.to_segments()
         
         # Convert segments to dict format
         segment_dicts = []
@@ -47,7 +151,7 @@ class DatasetManager:
                 'technical_terms': seg.technical_terms
             }
             if seg.embedding:
-                segment_dict['embedding'] = seg.embedding
+                segment_dict.update(encode_embedding(seg.embedding, self.embedding_dtype))
             segment_dicts.append(segment_dict)
         
         # Create new row
@@ -67,31 +171,116 @@ class DatasetManager:
             'version': version
         }
         
-        # Add to dataset
-        self.dataset = self.dataset.add_item(new_row)
-        
-        # Push to hub
-        await self.dataset.push_to_hub(self.dataset_name)
+        # Buffer rows and write them to the hub in batches
+        self._pending.append(new_row)
+        self._idx[metadata.video_id] = len(self.dataset) + len(self._pending) - 1
         logger.info(f"Added video {metadata.video_id} to dataset")
+        
+        if len(self._pending) >= self._flush_every:
+            await self.flush()
+    
+    async def flush(self):
+        """Append buffered videos to dataset and push to hub"""
+        if not self._pending:
+            return
+        if self.dataset is None:
+            await self.initialize()
+        
+        new_rows = Dataset.from_list(self._pending)
+        if len(self.dataset):
+            features = self._merge_features(self.dataset.features, new_rows.features)
+            self.dataset = self._migrate(features)
+            self.dataset = concatenate_datasets([self.dataset, new_rows.cast(features)])
+        else:
+            features = self._merge_features(new_rows.features, new_rows.features)
+            self.dataset = new_rows.cast(features)
+        self._pending = []
+        
+        await asyncio.to_thread(self.dataset.push_to_hub, self.dataset_name)
+        logger.info(f"Pushed {self.dataset_name} with {len(self.dataset)} videos")
+    
+    @staticmethod
+    def _merge_features(existing: Features, new: Features) -> Features:
+        """
+        Combine the dataset schema with the schema of new rows
+        
+        Fields missing from the dataset or only ever null (e.g. metadata
+        code_repos while no video had a repo link) are taken from the new
+        rows, and embedding fields always use the encoded types.
+        """
+        merged = _merge_feature(existing, new)
+        fields = _segment_fields(merged)
+        fields.update(EMBEDDING_FEATURES)
+        return _with_segment_fields(merged, fields)
+    
+    def _migrate(self, features: Features) -> Dataset:
+        """Bring existing rows to the given schema"""
+        if features == self.dataset.features:
+            return self.dataset
+        
+        embedding = _segment_fields(self.dataset.features).get('embedding')
+        if embedding is None or _is_null(embedding) or embedding == EMBEDDING_FEATURES['embedding']:
+            # Added fields are filled with nulls
+            return self.dataset.cast(features)
+        if isinstance(embedding, Value):
+            raise ValueError(f"Unsupported segment embedding type in {self.dataset_name}: {embedding}")
+        
+        # Rows written before quantization store float lists, encode them
+        logger.info(f"Encoding legacy embeddings in {self.dataset_name}")
+        fields = _segment_fields(features)
+        
+        def _encode(row: Dict) -> Dict:
+            segments = []
+            for seg in row['transcript_segments']:
+                segment = {name: seg.get(name) for name in fields}
+                if seg.get('embedding') is not None:
+                    segment.update(encode_embedding(seg['embedding'], self.embedding_dtype))
+                segments.append(segment)
+            return {'transcript_segments': segments}
+        
+        return self.dataset.map(_encode, features=features)
+    
+    async def close(self):
+        """Flush any buffered videos"""
+        await self.flush()
     
     async def get_video(self, video_id: str) -> Optional[Dict]:
         """Retrieve video data from dataset"""
-        if not self.dataset:
+        if self.dataset is None:
             await self.initialize()
-            
-        matches = self.dataset.filter(lambda x: x['video_id'] == video_id)
-        if not matches:
+        
+        idx = self._idx.get(video_id)
+        if idx is None:
             return None
-            
-        return matches[0]
+        if idx < len(self.dataset):
+            return self.dataset[idx]
+        return self._pending[idx - len(self.dataset)]
     
     async def list_videos(self) -> List[Dict]:
         """List all videos in dataset"""
-        if not self.dataset:
+        if self.dataset is None:
             await self.initialize()
-            
-        return [{
-            'video_id': item['video_id'],
-            'title': item['title'],
-            'upload_date': item['metadata']['upload_date']
-        } for item in self.dataset]
+        
+        if len(self.dataset):
+            # Project the needed columns as Arrow data so transcript segments
+            # and the rest of metadata are never converted to Python objects
+            table = self.dataset.select_columns(
+                ['video_id', 'title', 'metadata']
+            ).with_format("arrow")[:]
+            video_ids = table.column('video_id').to_pylist()
+            titles = table.column('title').to_pylist()
+            upload_dates = table.column('metadata').combine_chunks().field('upload_date').to_pylist()
+        else:
+            video_ids, titles, upload_dates = [], [], []
+        
+        videos = [{
+            'video_id': video_id,
+            'title': title,
+            'upload_date': upload_date
+        } for video_id, title, upload_date in zip(video_ids, titles, upload_dates)]
+        videos.extend({
+            'video_id': row['video_id'],
+            'title': row['title'],
+            'upload_date': row['metadata']['upload_date']
+        } for row in self._pending)
+        return videos
@@ -1,17 +1,25 @@
 # graphrag_platform/ingestion/video_processor.py
 import asyncio
+import multiprocessing
 import yt_dlp
-import whisper
-from typing import List, Dict, Tuple, Optional
+from faster_whisper import WhisperModel
+from typing import List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass
-from pathlib import Path
 import logging
+import warnings
+import numpy as np
+from openai import AsyncOpenAI
 from transformers import pipeline
 import torch
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from ._code_blocks import extract_code_repos, find_code_blocks, find_code_blocks_batch
+from ._speakers import assign_speakers
 
 logger = logging.getLogger(__name__)
 
+# Whisper and the diarization pipeline expect 16kHz mono audio
+_SAMPLE_RATE = 16000
+
 @dataclass
 class VideoMetadata:
     video_id: str
@@ -34,40 +42,174 @@ class TranscriptSegment:
     technical_terms: List[str]
     embedding: Optional[List[float]] = None
 
+@dataclass
+class SegmentColumns:
+    """Transcript segments stored column-wise for bulk operations"""
+    starts: np.ndarray  # (N,) float64
+    ends: np.ndarray  # (N,) float64
+    speakers: np.ndarray  # (N,) object, None where unknown
+    texts: List[str]
+    code_blocks: List[List[str]]
+    technical_terms: List[List[str]]
+    embeddings: Optional[np.ndarray] = None  # (N, D) float32, NaN rows not embedded
+
+    @classmethod
+    def from_transcription(cls, transcription: Dict) -> "SegmentColumns":
+        """Build columns from Whisper transcription segments in one pass"""
+        starts, ends, texts = [], [], []
+        for segment in transcription['segments']:
+            starts.append(segment['start'])
+            ends.append(segment['end'])
+            texts.append(segment['text'])
+        
+        n = len(texts)
+        return cls(
+            starts=np.array(starts, dtype=np.float64),
+            ends=np.array(ends, dtype=np.float64),
+            speakers=np.full(n, None, dtype=object),
+            texts=texts,
+            code_blocks=[[] for _ in range(n)],
+            technical_terms=[[] for _ in range(n)]  # Placeholder for now
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def to_segments(self) -> List[TranscriptSegment]:
+        """Convert to per-segment dataclasses"""
+        segments = []
+        for i in range(len(self)):
+            embedding = None
+            if self.embeddings is not None and not np.isnan(self.embeddings[i, 0]):
+                embedding = self.embeddings[i].tolist()
+            segments.append(TranscriptSegment(
+                start_time=float(self.starts[i]),
+                end_time=float(self.ends[i]),
+                text=self.texts[i],
+                speaker=self.speakers[i],
+                code_blocks=self.code_blocks[i],
+                technical_terms=self.technical_terms[i],
+                embedding=embedding
+            ))
+        return segments
+
 class VideoProcessor:
     def __init__(self, 
-                 output_dir: str = "data",
-                 max_workers: int = 4,
-                 gpu_device: int = 0):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+                 output_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 gpu_device: int = 0,
+                 embedding_model: Optional[str] = "text-embedding-3-large",
+                 embedding_batch_size: int = 256,
+                 embedding_concurrency: int = 4,
+                 max_decoded_audio: int = 2):
+        if output_dir is not None:
+            # Audio is streamed through ffmpeg, nothing is written to disk
+            warnings.warn(
+                "output_dir is unused and will be removed",
+                DeprecationWarning,
+                stacklevel=2
+            )
+        
+        # Processes for pure-Python CPU work; torch/CTranslate2 calls release
+        # the GIL and run in threads via asyncio.to_thread. Workers are
+        # spawned rather than forked so they never inherit model or thread
+        # state. Defaults to one worker per CPU.
+        self.cpu_executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
         
         # Initialize components
-        self.whisper_model = whisper.load_model("large-v3")
+        # CTranslate2 Whisper with int8 weights
+        use_cuda = torch.cuda.is_available()
+        self.whisper_model = WhisperModel(
+            "large-v3",
+            device="cuda" if use_cuda else "cpu",
+            device_index=gpu_device,
+            compute_type="int8_float16" if use_cuda else "int8"
+        )
         self.diarization = pipeline(
             "automatic-speech-recognition",
             model="pyannote/speaker-diarization",
-            device=f"cuda:{gpu_device}" if torch.cuda.is_available() else "cpu"
+            device=f"cuda:{gpu_device}" if use_cuda else "cpu",
+            torch_dtype=torch.float16 if use_cuda else None
         )
         self.code_detector = pipeline(
             "text-classification",
             model="microsoft/codebert-base"
         )
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Segment embeddings, skipped if no model is configured
+        self.embedding_model = embedding_model
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_concurrency = embedding_concurrency
+        # Created on first use so constructing the processor does not
+        # require OPENAI_API_KEY
+        self.openai_client: Optional[AsyncOpenAI] = None
+        # Bounds embedding requests in flight across all videos
+        self._embedding_semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Serializes the GPU phase (transcription and diarization) so one
+        # video occupies the GPU at a time
+        self._gpu_lock: Optional[asyncio.Lock] = None
+        # Bounds videos holding decoded audio, i.e. decoding or waiting for
+        # or in the GPU phase; a long talk decodes to several GB
+        self.max_decoded_audio = max_decoded_audio
+        self._audio_semaphore: Optional[asyncio.Semaphore] = None
         
-    async def process_video(self, url: str) -> Tuple[VideoMetadata, List[TranscriptSegment]]:
+    async def process_videos(self,
+                             urls: List[str],
+                             concurrency: int = 8
+                             ) -> List[Union[Tuple[VideoMetadata, SegmentColumns], BaseException]]:
+        """
+        Process several videos concurrently
+        
+        Args:
+            urls: Video URLs
+            concurrency: Maximum number of videos in flight
+            
+        Returns:
+            (metadata, segments) tuple per URL, in order, or the exception
+            raised while processing that URL
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def _process(url: str):
+            async with semaphore:
+                return await self.process_video(url)
+        
+        return await asyncio.gather(
+            *(_process(url) for url in urls),
+            return_exceptions=True
+        )
+    
+    async def process_video(self, url: str) -> Tuple[VideoMetadata, SegmentColumns]:
         """Process video through complete pipeline"""
-        # Download video
-        video_path, metadata = await self._download_video(url)
-        
-        # Process in parallel
-        tasks = [
-            self._transcribe_audio(video_path),
-            self._extract_speakers(video_path),
-            self._detect_code_blocks(metadata.description)
-        ]
+        # Resolve metadata; overlaps freely with other videos
+        info, metadata = await self._extract_info(url)
+        
+        # Created lazily so they bind to the running event loop
+        if self._audio_semaphore is None:
+            self._audio_semaphore = asyncio.Semaphore(self.max_decoded_audio)
+        if self._gpu_lock is None:
+            self._gpu_lock = asyncio.Lock()
+        
+        async with self._audio_semaphore:
+            # Decode the audio stream
+            audio = await self._load_audio(info)
+            
+            # Process in parallel, holding the GPU for this video only
+            tasks = [
+                self._transcribe_audio(audio),
+                self._extract_speakers(audio)
+            ]
+            async with self._gpu_lock:
+                transcription, speakers = await asyncio.gather(*tasks)
+            # Release the decoded audio before the slot is handed on
+            del audio, tasks
         
-        transcription, speakers, code_blocks = await asyncio.gather(*tasks)
+        # A single description is cheaper to scan inline than to ship to
+        # the process pool
+        code_blocks = find_code_blocks(metadata.description)
         
         # Create segments
         segments = await self._create_segments(
@@ -78,138 +220,176 @@ class VideoProcessor:
         
         return metadata, segments
     
-    async def _download_video(self, url: str) -> Tuple[Path, VideoMetadata]:
-        """Download video and extract metadata"""
+    async def _extract_info(self, url: str) -> Tuple[Dict, VideoMetadata]:
+        """Extract metadata and the audio stream URL without downloading"""
         ydl_opts = {
             'format': 'bestaudio/best',
-            'paths': {'home': str(self.output_dir)},
-            'extract_audio': True,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'wav',
-            }]
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            
-            metadata = VideoMetadata(
-                video_id=info['id'],
-                title=info['title'],
-                description=info['description'],
-                upload_date=info['upload_date'],
-                duration=info['duration'],
-                tags=info.get('tags', []),
-                speakers=[],  # Will be filled later
-                code_repos=self._extract_code_repos(info['description']),
-                chapters=info.get('chapters', [])
-            )
-            
-            video_path = self.output_dir / f"{info['id']}.wav"
-            return video_path, metadata
+        def _extract():
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                return ydl.extract_info(url, download=False)
+        
+        info = await asyncio.to_thread(_extract)
+        
+        metadata = VideoMetadata(
+            video_id=info['id'],
+            title=info['title'],
+            description=info['description'],
+            upload_date=info['upload_date'],
+            duration=info['duration'],
+            tags=info.get('tags', []),
+            speakers=[],  # Will be filled later
+            code_repos=self._extract_code_repos(info['description']),
+            chapters=info.get('chapters', [])
+        )
+        
+        return info, metadata
+    
+    async def _load_audio(self, info: Dict) -> np.ndarray:
+        """Decode the audio stream to 16kHz mono float32 via an ffmpeg pipe"""
+        cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+        headers = info.get('http_headers')
+        if headers:
+            cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+        cmd += [
+            "-i", info['url'],
+            "-f", "s16le",
+            "-ac", "1",
+            "-ar", str(_SAMPLE_RATE),
+            "-"
+        ]
+        
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            # Do not leave ffmpeg running for a cancelled video
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            raise
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to decode audio: {stderr.decode(errors='replace')}")
+        
+        return np.frombuffer(stdout, np.int16).astype(np.float32) / 32768.0
     
-    async def _transcribe_audio(self, audio_path: Path) -> Dict:
+    async def _transcribe_audio(self, audio: np.ndarray) -> Dict:
         """Transcribe audio using Whisper"""
         def _transcribe():
-            return self.whisper_model.transcribe(
-                str(audio_path),
+            # Segments are generated lazily; consume them in the worker.
+            # The VAD filter skips silence before decoding.
+            segments, _ = self.whisper_model.transcribe(
+                audio,
                 task="transcribe",
-                language="en"
+                language="en",
+                beam_size=5,
+                vad_filter=True
             )
+            return {
+                "segments": [
+                    {"start": seg.start, "end": seg.end, "text": seg.text}
+                    for seg in segments
+                ]
+            }
         
-        return await asyncio.get_event_loop().run_in_executor(
-            self.executor,
-            _transcribe
-        )
+        return await asyncio.to_thread(_transcribe)
     
-    async def _extract_speakers(self, audio_path: Path) -> List[Dict]:
+    async def _extract_speakers(self, audio: np.ndarray) -> List[Dict]:
         """Extract speaker segments using diarization"""
         def _diarize():
-            return self.diarization(str(audio_path))
+            # inference_mode is thread-local, enter it in the worker
+            with torch.inference_mode():
+                return self.diarization({"raw": audio, "sampling_rate": _SAMPLE_RATE})
         
-        diarization = await asyncio.get_event_loop().run_in_executor(
-            self.executor,
-            _diarize
-        )
+        diarization = await asyncio.to_thread(_diarize)
         return diarization['chunks']
     
-    async def _detect_code_blocks(self, text: str) -> List[str]:
-        """Detect code blocks in text"""
-        def _detect():
-            # Split text into potential code blocks
-            blocks = text.split("```")
-            code_blocks = []
-            
-            for i, block in enumerate(blocks):
-                if i % 2 == 1:  # Inside code block
-                    code_blocks.append(block.strip())
-                else:
-                    # Check for indented code blocks
-                    lines = block.split("\n")
-                    current_block = []
-                    for line in lines:
-                        if line.startswith("    ") or line.startswith("\t"):
-                            current_block.append(line.strip())
-                        elif current_block:
-                            code_blocks.append("\n".join(current_block))
-                            current_block = []
-            
-            return code_blocks
-        
-        return await asyncio.get_event_loop().run_in_executor(
-            self.executor,
-            _detect
-        )
-    
     async def _create_segments(self,
                              transcription: Dict,
                              speakers: List[Dict],
-                             code_blocks: List[str]) -> List[TranscriptSegment]:
+                             code_blocks: List[str]) -> SegmentColumns:
         """Create transcript segments with metadata"""
-        segments = []
+        segments = SegmentColumns.from_transcription(transcription)
         
-        for segment in transcription['segments']:
-            # Find speaker for this segment
-            speaker = self._find_speaker(segment['start'], speakers)
-            
-            # Extract any code blocks in this segment
-            segment_code_blocks = await self._detect_code_blocks(segment['text'])
-            
-            # Extract technical terms (placeholder for now)
-            technical_terms = []
-            
-            segments.append(TranscriptSegment(
-                start_time=segment['start'],
-                end_time=segment['end'],
-                text=segment['text'],
-                speaker=speaker,
-                code_blocks=segment_code_blocks,
-                technical_terms=technical_terms
-            ))
+        # Find speaker for every segment in one pass
+        segments.speakers[:] = self._assign_speakers(segments.starts, speakers)
         
+        # Extract code blocks from all segments at once
+        segments.code_blocks = await asyncio.get_running_loop().run_in_executor(
+            self.cpu_executor,
+            find_code_blocks_batch,
+            segments.texts
+        )
+        
+        await self._embed_segments(segments)
         return segments
     
-    def _find_speaker(self, timestamp: float, speakers: List[Dict]) -> Optional[str]:
-        """Find speaker at given timestamp"""
-        for speaker in speakers:
-            if speaker['start'] <= timestamp <= speaker['end']:
-                return speaker['speaker']
-        return None
+    async def _embed_segments(self, segments: SegmentColumns):
+        """Embed segment texts in batches"""
+        if not self.embedding_model:
+            return
+        
+        # The embeddings API rejects empty inputs
+        mask = np.array([bool(text.strip()) for text in segments.texts], dtype=bool)
+        texts = [text for text, keep in zip(segments.texts, mask) if keep]
+        if not texts:
+            return
+        
+        batches = [
+            texts[i:i + self.embedding_batch_size]
+            for i in range(0, len(texts), self.embedding_batch_size)
+        ]
+        if self.openai_client is None:
+            self.openai_client = AsyncOpenAI()
+        if self._embedding_semaphore is None:
+            self._embedding_semaphore = asyncio.Semaphore(self.embedding_concurrency)
+        
+        async def _embed(batch: List[str]):
+            async with self._embedding_semaphore:
+                return await self.openai_client.embeddings.create(
+                    input=batch,
+                    model=self.embedding_model
+                )
+        
+        responses = await asyncio.gather(*(_embed(batch) for batch in batches))
+        
+        # Items carry the index of their input; do not rely on response order
+        vectors = np.array(
+            [
+                item.embedding
+                for response in responses
+                for item in sorted(response.data, key=lambda item: item.index)
+            ],
+            dtype=np.float32
+        )
+        embeddings = np.full((len(segments), vectors.shape[1]), np.nan, dtype=np.float32)
+        embeddings[mask] = vectors
+        segments.embeddings = embeddings
+    
+    def close(self):
+        """Shut down worker pool"""
+        self.cpu_executor.shutdown()
+    
+    def __enter__(self) -> "VideoProcessor":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    @staticmethod
+    def _assign_speakers(timestamps: np.ndarray,
+                         speakers: List[Dict]) -> List[Optional[str]]:
+        """Find speaker at each timestamp"""
+        return assign_speakers(timestamps, speakers)
     
     @staticmethod
     def _extract_code_repos(description: str) -> List[str]:
         """Extract code repository links from description"""
-        import re
-        
-        # Common code repository patterns
-        repo_patterns = [
-            r'https?://github\.com/[\w-]+/[\w-]+',
-            r'https?://gitlab\.com/[\w-]+/[\w-]+',
-            r'https?://bitbucket\.org/[\w-]+/[\w-]+'
-        ]
-        
-        repos = []
-        for pattern in repo_patterns:
-            repos.extend(re.findall(pattern, description))
-            
-        return repos
+        return extract_code_repos(description)
@@ -87,7 +87,7 @@ async def main():
         print(result['answer'])
         
     finally:
-        manager.close()
+        await manager.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
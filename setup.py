@@ -9,7 +9,7 @@ setup(
         "neo4j-graphrag",
         "openai",
         "yt-dlp",
-        "whisper",
+        "faster-whisper",
         "datasets",
         "transformers",
         "langchain",
@@ -20,7 +20,12 @@ setup(
         "pytest",
         "pytest-asyncio",
         "python-dotenv",
-        "torch"
+        "torch",
+        "numpy"
     ],
+    extras_require={
+        "numba": ["numba"],
+        "re2": ["google-re2"],
+    },
     python_requires=">=3.9",
 )
@@ -0,0 +1,204 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import redis.asyncio as redis
+
+from graphrag import GraphRAGConfig, GraphRAGManager
+from graphrag.cache import AsyncEmbeddingCache, SearchResultCache, SimilarityIndex, normalize_query
+
+def unit(*values):
+    vec = np.array(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+class FakeEmbedder:
+    """Embeds known (normalized) texts to fixed vectors and counts requests"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = []
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return self.vectors[normalize_query(text)]
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client, shared by caches"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+        self.fail = False
+
+    async def _call(self, name, *args):
+        self.calls.append(name)
+        if self.fail:
+            raise redis.ConnectionError("unreachable")
+
+    async def get(self, key):
+        await self._call("get", key)
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        await self._call("setex", key)
+        self.data[key] = value.encode()
+
+    async def incr(self, key):
+        await self._call("incr", key)
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def aclose(self):
+        self.calls.append("aclose")
+
+def result_cache(fake, **kwargs):
+    cache = SearchResultCache(**kwargs)
+    cache._redis = fake
+    return cache
+
+async def test_l1_hit_within_version_ttl_needs_no_redis_call():
+    fake = FakeRedis()
+    cache = result_cache(fake, version_ttl=60)
+    key = await cache.key("What is GraphRAG?", "vector", 5)
+    await cache.set(key, {"answer": "a"})
+    fake.calls.clear()
+
+    key = await cache.key("what is  graphrag?", "vector", 5)
+    assert await cache.get(key) == {"answer": "a"}
+    assert fake.calls == []
+
+async def test_invalidation_is_shared_through_redis():
+    fake = FakeRedis()
+    writer = result_cache(fake, version_ttl=0)
+    reader = result_cache(fake, version_ttl=0)
+    await writer.set(await writer.key("q", "vector", 5), {"answer": "old"})
+    assert await reader.get(await reader.key("q", "vector", 5)) == {"answer": "old"}
+
+    await writer.invalidate()
+    assert await reader.get(await reader.key("q", "vector", 5)) is None
+
+async def test_unreachable_redis_falls_back_to_local_version():
+    fake = FakeRedis()
+    fake.fail = True
+    cache = result_cache(fake, version_ttl=60)
+    key = await cache.key("q", "vector", 5)
+    await cache.set(key, {"answer": "a"})
+
+    assert await cache.get(await cache.key("q", "vector", 5)) == {"answer": "a"}
+    # The failed version lookup is cached as well
+    assert fake.calls.count("get") == 1
+
+async def test_invalidate_local_clears_l1():
+    cache = SearchResultCache()
+    key = await cache.key("q", "vector", 5)
+    await cache.set(key, {"answer": "a"})
+
+    cache.invalidate_local()
+    assert await cache.get(await cache.key("q", "vector", 5)) is None
+
+async def test_aclose_closes_redis():
+    fake = FakeRedis()
+    await result_cache(fake).aclose()
+    assert fake.calls == ["aclose"]
+
+def test_similarity_index_wraps_around_oldest_first():
+    index = SimilarityIndex(capacity=3)
+    for i in range(5):
+        index.add(unit(*np.eye(5)[i]), i)
+
+    assert len(index) == 3
+    vectors, values = index.entries()
+    assert values == [2, 3, 4]
+    np.testing.assert_array_equal(vectors, np.eye(5, dtype=np.float32)[2:])
+    # Overwritten entries are gone
+    assert index.best(unit(1, 0, 0, 0, 0), 0.5) is None
+    assert index.best(unit(0, 0, 0, 0, 1), 0.5) == 4
+
+def test_similarity_index_threshold():
+    index = SimilarityIndex(capacity=4)
+    assert index.best(unit(1, 0), 0.0) is None
+    assert index.entries() == (None, [])
+
+    index.add(unit(1, 0), "a")
+    assert index.best(unit(1, 0.1), 0.99) == "a"
+    assert index.best(unit(1, 1), 0.99) is None
+
+def test_embedding_cache_lru_evicts_oldest():
+    embedder = FakeEmbedder({"a": [1.0, 0.0], "b": [0.0, 1.0], "c": [1.0, 1.0]})
+    cache = AsyncEmbeddingCache(embedder, max_size=2)
+
+    cache.embed_query("a")
+    cache.embed_query("b")
+    cache.embed_query(" A ")  # refreshes "a"
+    cache.embed_query("c")    # evicts "b"
+    cache.embed_query("a")
+    cache.embed_query("b")
+    assert embedder.calls == ["a", "b", "c", "b"]
+
+def test_embedding_cache_serves_near_duplicates_per_scope():
+    embedder = FakeEmbedder({"q": [1.0, 0.0], "q?": [1.0, 0.01], "other": [0.0, 1.0]})
+    cache = AsyncEmbeddingCache(embedder, similarity_threshold=0.97)
+
+    result, vec = cache.lookup("q", ("vector", 5))
+    assert result is None
+    cache.store(vec, ("vector", 5), {"answer": "a"})
+
+    assert cache.lookup("q?", ("vector", 5))[0] == {"answer": "a"}
+    assert cache.lookup("other", ("vector", 5))[0] is None
+    assert cache.lookup("q", ("vector", 10))[0] is None
+
+def test_embedding_cache_drops_results_from_stale_generation():
+    cache = AsyncEmbeddingCache(FakeEmbedder({"q": [1.0, 0.0]}))
+    generation = cache.generation
+    _, vec = cache.lookup("q", "scope")
+
+    cache.invalidate()
+    cache.store(vec, "scope", {"answer": "stale"}, generation=generation)
+    assert cache.lookup("q", "scope")[0] is None
+
+    cache.store(vec, "scope", {"answer": "fresh"}, generation=cache.generation)
+    assert cache.lookup("q", "scope")[0] == {"answer": "fresh"}
+
+class FakeRAG:
+    def __init__(self):
+        self.queries = []
+
+    def search(self, query_text, retriever_config):
+        self.queries.append(query_text)
+        return SimpleNamespace(answer=f"answer to {query_text}", items=[])
+
+@pytest.fixture
+def manager():
+    # Built without __init__ so no Neo4j or OpenAI client is created
+    manager = GraphRAGManager.__new__(GraphRAGManager)
+    manager.config = GraphRAGConfig(
+        neo4j_uri="bolt://localhost:7687",
+        neo4j_username="neo4j",
+        neo4j_password="password",
+        openai_api_key="key",
+        vector_index_name="index"
+    )
+    manager.embedder = AsyncEmbeddingCache(
+        FakeEmbedder({"what is graphrag": [1.0, 0.0], "what is graphrag?": [1.0, 0.01]})
+    )
+    manager.result_cache = SearchResultCache()
+    manager._rag_by_type = {"vector": FakeRAG(), "text2cypher": FakeRAG()}
+    manager._search_semaphore = None
+    return manager
+
+async def test_search_uses_similarity_tier_for_vector_retrievers(manager):
+    first = await manager.search("What is GraphRAG", retriever_type="vector")
+    second = await manager.search("what is graphrag?", retriever_type="vector")
+
+    assert second == first
+    assert manager._rag_by_type["vector"].queries == ["What is GraphRAG"]
+
+async def test_search_skips_similarity_tier_for_text2cypher(manager):
+    await manager.search("What is GraphRAG", retriever_type="text2cypher")
+    await manager.search("what is graphrag?", retriever_type="text2cypher")
+    # Exact repeats are still served from the result cache
+    await manager.search("what is  GraphRAG?", retriever_type="text2cypher")
+
+    assert manager._rag_by_type["text2cypher"].queries == ["What is GraphRAG", "what is graphrag?"]
+    assert manager.embedder.embedder.calls == []
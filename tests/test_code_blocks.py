@@ -0,0 +1,67 @@
+import pytest
+
+from ingestion._code_blocks import (
+    extract_code_repos,
+    find_code_blocks,
+    find_code_blocks_batch,
+)
+
+TEXTS = [
+    "intro\n    x = 1\n\ty = 2\nback to prose",
+    "see ```python\nprint('hi')\n``` above",
+    "ends with code\n    return x",
+    "",
+    "no code here",
+    "```a``` and ```b```",
+]
+
+def test_fenced_block():
+    assert find_code_blocks("before ```\nfoo()\n``` after") == ["foo()"]
+
+def test_indented_block_lines_are_stripped():
+    assert find_code_blocks(TEXTS[0]) == ["x = 1\ny = 2"]
+
+def test_indented_block_at_end_of_text():
+    # Returned even without a following unindented line
+    assert find_code_blocks(TEXTS[2]) == ["return x"]
+
+def test_unterminated_fence_is_not_code():
+    assert find_code_blocks("start ``` never closed") == []
+
+def test_short_indent_is_not_code():
+    assert find_code_blocks("text\n  two spaces\n") == []
+
+@pytest.mark.parametrize("texts", [
+    TEXTS,
+    list(reversed(TEXTS)),
+    [],
+    [""],
+    ["    a", "    b"],
+])
+def test_batch_matches_single_text(texts):
+    assert find_code_blocks_batch(texts) == [find_code_blocks(t) for t in texts]
+
+def test_batch_fence_does_not_span_segments():
+    texts = ["opens ``` here", "closes ``` here"]
+    assert find_code_blocks_batch(texts) == [[], []]
+
+def test_batch_indented_block_stops_at_segment_boundary():
+    texts = ["    first", "    second"]
+    assert find_code_blocks_batch(texts) == [["first"], ["second"]]
+
+def test_extract_code_repos_in_document_order():
+    description = (
+        "code: https://gitlab.com/a/b, mirror https://github.com/c-d/e_f "
+        "and https://bitbucket.org/g/h plus https://example.com/x/y"
+    )
+    assert extract_code_repos(description) == [
+        "https://gitlab.com/a/b",
+        "https://github.com/c-d/e_f",
+        "https://bitbucket.org/g/h",
+    ]
+
+def test_extract_code_repos_stops_at_non_ascii():
+    # Same result with RE2 and re
+    assert extract_code_repos("https://github.com/user/repö") == [
+        "https://github.com/user/rep"
+    ]
@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+from datasets import Dataset
+
+from ingestion.dataset_manager import DatasetManager, decode_embedding, encode_embedding
+from ingestion.video_processor import TranscriptSegment, VideoMetadata
+
+EMBEDDING = np.linspace(-1, 1, 16, dtype=np.float32)
+
+def metadata(video_id, code_repos=(), chapters=()):
+    return VideoMetadata(
+        video_id=video_id,
+        title=f"Title {video_id}",
+        description="",
+        upload_date="20240101",
+        duration=60,
+        tags=["graphs"],
+        speakers=[],
+        code_repos=list(code_repos),
+        chapters=list(chapters)
+    )
+
+def segment(embedding=None):
+    return TranscriptSegment(
+        start_time=0.0,
+        end_time=1.0,
+        text="hello",
+        speaker="SPEAKER_00",
+        code_blocks=[],
+        technical_terms=[],
+        embedding=embedding
+    )
+
+def stored_row(video_id, **segment_fields):
+    """Row as written by an earlier version of DatasetManager"""
+    return {
+        'video_id': video_id,
+        'title': f"Title {video_id}",
+        'description': "",
+        'transcript_segments': [{
+            'start_time': 0.0,
+            'end_time': 1.0,
+            'text': "hi",
+            'speaker': "SPEAKER_00",
+            'code_blocks': [],
+            'technical_terms': [],
+            **segment_fields
+        }],
+        'metadata': {
+            'upload_date': "20230101",
+            'duration': 30,
+            'tags': ["graphs"],
+            'speakers': [],
+            'code_repos': [],
+            'chapters': []
+        },
+        'version': "1.0.0"
+    }
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(Dataset, "push_to_hub", lambda self, *args, **kwargs: None)
+    return DatasetManager("user/videos", flush_every=100)
+
+def with_rows(manager, rows):
+    manager.dataset = Dataset.from_list(rows)
+    manager._build_index()
+    return manager
+
+@pytest.mark.parametrize("dtype,atol", [("fp16", 1e-3), ("int8", 1e-2)])
+def test_embedding_round_trip(dtype, atol):
+    decoded = decode_embedding(encode_embedding(EMBEDDING.tolist(), dtype))
+    assert decoded.dtype == np.float32
+    np.testing.assert_allclose(decoded, EMBEDDING, atol=atol)
+
+def test_int8_round_trip_of_zero_vector():
+    decoded = decode_embedding(encode_embedding([0.0] * 4, "int8"))
+    np.testing.assert_array_equal(decoded, np.zeros(4, np.float32))
+
+def test_decode_missing_and_legacy_embeddings():
+    assert decode_embedding({'embedding': None}) is None
+    np.testing.assert_array_equal(
+        decode_embedding({'embedding': [0.5, 1.0]}),
+        np.array([0.5, 1.0], np.float32)
+    )
+
+async def test_flush_adds_embedding_fields_to_existing_rows(manager):
+    with_rows(manager, [stored_row("old")])
+
+    await manager.add_video(metadata("new"), [segment(EMBEDDING.tolist())])
+    await manager.flush()
+
+    assert len(manager.dataset) == 2
+    old = await manager.get_video("old")
+    new = await manager.get_video("new")
+    assert decode_embedding(old['transcript_segments'][0]) is None
+    np.testing.assert_allclose(
+        decode_embedding(new['transcript_segments'][0]), EMBEDDING, atol=1e-3
+    )
+
+async def test_flush_encodes_legacy_float_embeddings(manager):
+    with_rows(manager, [stored_row("old", embedding=EMBEDDING.tolist())])
+
+    await manager.add_video(metadata("new"), [segment(EMBEDDING.tolist())])
+    await manager.flush()
+
+    for video_id in ("old", "new"):
+        row = await manager.get_video(video_id)
+        assert row['transcript_segments'][0]['embedding_dtype'] == "fp16"
+        np.testing.assert_allclose(
+            decode_embedding(row['transcript_segments'][0]), EMBEDDING, atol=1e-3
+        )
+
+async def test_flush_without_embeddings_keeps_encoded_schema(manager):
+    with_rows(manager, [stored_row("old", **encode_embedding(EMBEDDING.tolist()))])
+    features = manager.dataset.features
+
+    await manager.add_video(metadata("new"), [segment()])
+    await manager.flush()
+
+    assert manager.dataset.features == features
+    new = await manager.get_video("new")
+    assert decode_embedding(new['transcript_segments'][0]) is None
+
+async def test_flush_after_rows_with_only_empty_lists(manager):
+    # Stored with list<null> metadata types, as after a first video without
+    # repo links or chapters
+    with_rows(manager, [stored_row("old")])
+
+    repos = ["https://github.com/neo4j/neo4j-graphrag-python"]
+    chapters = [{'title': "Intro", 'start_time': 0.0, 'end_time': 10.0}]
+    await manager.add_video(metadata("new", repos, chapters), [segment()])
+    await manager.flush()
+
+    assert manager._pending == []
+    new = await manager.get_video("new")
+    assert new['metadata']['code_repos'] == repos
+    assert new['metadata']['chapters'] == chapters
+    old = await manager.get_video("old")
+    assert old['metadata']['code_repos'] == []
+
+async def test_flush_rejects_unknown_embedding_type(manager):
+    with_rows(manager, [stored_row("old", embedding="not an embedding")])
+
+    await manager.add_video(metadata("new"), [segment(EMBEDDING.tolist())])
+    with pytest.raises(ValueError):
+        await manager.flush()
+    assert len(manager._pending) == 1
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from agents.base import AgentState
+from agents.router import RouterAgent
+
+class FakeLLM:
+    def __init__(self, response="Graph Traversal\nThe query asks about relationships.",
+                 model_name="gpt-4"):
+        self.response = response
+        self.model_name = model_name
+        self.prompts = []
+
+    async def predict(self, prompt):
+        self.prompts.append(prompt)
+        return self.response
+
+class FakeEmbedder:
+    model = "text-embedding-3-large"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+def at_cosine(cos):
+    """Unit vector with the given cosine similarity to [1, 0]"""
+    return [cos, float(np.sqrt(1 - cos ** 2))]
+
+EMBEDDINGS = {
+    "how are papers related": [1.0, 0.0],
+    "close paraphrase": at_cosine(0.93),
+    "different question": at_cosine(0.91),
+}
+
+async def route(router, query):
+    state = await router.process(AgentState(query=query))
+    return state.intermediate_steps[-1]["strategy"]
+
+@pytest.mark.parametrize("response,strategy", [
+    ("Graph Traversal\nVector search would miss the relationships.", "vector_cypher"),
+    ("**Hybrid Search**\nKeywords matter here.", "hybrid"),
+    ("\n  Text2Cypher  \nA graph traversal is not needed.", "text2cypher"),
+    ("Vector Search", "vector"),
+    # Strategies named only in the explanation are ignored
+    ("I am not sure.\nText2Cypher or Hybrid Search could work.", "vector"),
+    ("", "vector"),
+])
+def test_parse_strategy_reads_first_line(response, strategy):
+    assert RouterAgent._parse_strategy(response) == strategy
+
+async def test_cache_hit_above_threshold_only():
+    llm = FakeLLM()
+    router = RouterAgent(llm, embedder=FakeEmbedder(EMBEDDINGS))
+
+    assert await route(router, "how are papers related") == "vector_cypher"
+    assert await route(router, "close paraphrase") == "vector_cypher"
+    assert len(llm.prompts) == 1
+
+    llm.response = "Hybrid Search"
+    assert await route(router, "different question") == "hybrid"
+    assert len(llm.prompts) == 2
+
+async def test_cache_not_used_after_first_step():
+    llm = FakeLLM()
+    router = RouterAgent(llm, embedder=FakeEmbedder(EMBEDDINGS))
+    await route(router, "how are papers related")
+
+    state = AgentState(query="how are papers related")
+    state.intermediate_steps.append({"agent": "retriever"})
+    await router.process(state)
+    assert len(llm.prompts) == 2
+
+async def test_cache_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "router_cache.npz")
+    router = RouterAgent(FakeLLM(), FakeEmbedder(EMBEDDINGS), cache_path=path, save_every=100)
+    await route(router, "how are papers related")
+    await router.close()
+
+    llm = FakeLLM(response="Vector Search")
+    reloaded = RouterAgent(llm, FakeEmbedder(EMBEDDINGS), cache_path=path)
+    assert await route(reloaded, "close paraphrase") == "vector_cypher"
+    assert llm.prompts == []
+    assert [p.name for p in tmp_path.iterdir()] == ["router_cache.npz"]
+
+async def test_cache_saved_every_n_decisions(tmp_path):
+    path = tmp_path / "router_cache.npz"
+    router = RouterAgent(FakeLLM(), FakeEmbedder(EMBEDDINGS), cache_path=str(path), save_every=2)
+
+    await route(router, "how are papers related")
+    assert not path.exists()
+    await route(router, "different question")
+    assert path.exists()
+
+async def test_cache_from_other_model_is_ignored(tmp_path):
+    path = str(tmp_path / "router_cache.npz")
+    router = RouterAgent(FakeLLM(), FakeEmbedder(EMBEDDINGS), cache_path=path)
+    await route(router, "how are papers related")
+    await router.close()
+
+    llm = FakeLLM(response="Vector Search", model_name="gpt-4o")
+    reloaded = RouterAgent(llm, FakeEmbedder(EMBEDDINGS), cache_path=path)
+    assert await route(reloaded, "how are papers related") == "vector"
+    assert len(llm.prompts) == 1
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from ingestion._numba_kernels import assign_speakers as sweep_kernel
+from ingestion._speakers import assign_speakers, covering_turns
+
+def turn(start, end, speaker):
+    return {"start": start, "end": end, "speaker": speaker}
+
+def test_no_speakers():
+    assert assign_speakers(np.array([0.0, 1.0]), []) == [None, None]
+
+def test_no_timestamps():
+    assert assign_speakers(np.array([]), [turn(0, 1, "A")]) == []
+
+def test_gaps_between_turns_have_no_speaker():
+    speakers = [turn(0, 2, "A"), turn(5, 7, "B")]
+    ts = np.array([-1.0, 0.0, 1.0, 2.0, 3.0, 5.0, 7.5])
+    assert assign_speakers(ts, speakers) == [None, "A", "A", "A", None, "B", None]
+
+def test_unsorted_turns_and_timestamps():
+    speakers = [turn(5, 7, "B"), turn(0, 2, "A")]
+    ts = np.array([6.0, 1.0, 3.0])
+    assert assign_speakers(ts, speakers) == ["B", "A", None]
+
+def test_overlap_prefers_turn_extending_furthest():
+    # B starts later but ends before the long turn of A
+    speakers = [turn(0, 10, "A"), turn(2, 4, "B")]
+    ts = np.array([1.0, 3.0, 6.0, 11.0])
+    assert assign_speakers(ts, speakers) == ["A", "A", "A", None]
+
+def test_ties_choose_earliest_turn():
+    speakers = [turn(0, 5, "A"), turn(1, 5, "B")]
+    assert assign_speakers(np.array([3.0]), speakers) == ["A"]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_fallback_matches_kernel(seed):
+    rng = np.random.default_rng(seed)
+    starts = np.sort(rng.uniform(0, 100, 40).round(1))
+    ends = starts + rng.uniform(0, 15, 40).round(1)
+    ts = np.sort(rng.uniform(-5, 120, 200).round(1))
+
+    np.testing.assert_array_equal(
+        covering_turns(ts, starts, ends),
+        sweep_kernel(ts, starts, ends)
+    )